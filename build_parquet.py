@@ -0,0 +1,88 @@
+import ast
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# ---------------------------
+# One-time CSV -> Parquet conversion for the dashboard
+# Run: python build_parquet.py
+# ---------------------------
+SOURCE_CSV = "imdb_clean.csv"
+PARQUET_PATH = "imdb_clean.parquet"
+
+# Movie-level columns kept for the dashboard: the analysis fields plus the
+# descriptive ones shown in the Data table tab and the CSV export
+CLEAN_COLUMNS = [
+    "title", "year", "certificate", "duration", "genre", "rating", "metascore",
+    "director", "cast", "votes", "review_count", "metadata",
+]
+
+# Columns the exploded genre/cast views carry alongside the list element
+EXPLODE_COLUMNS = ["title", "year", "duration", "metadata"]
+
+# Stored as Arrow list<string> columns: one row per movie instead of the
+# exploded genre/cast tables, which repeat every movie once per list element
+LIST_COLUMNS = ["genre", "cast"]
+
+# 'year' carries imputed fractional values in the clean CSVs, so it stays float here
+DTYPES = {"year": "float32", "duration": "Int16", "metadata": "float32"}
+
+ROW_GROUP_SIZE = 128_000
+
+# Header variants seen in the source CSVs, after normalize_name
+COLUMN_RENAMES = {"meta_data": "metadata", "duration_": "duration"}
+
+
+def normalize_name(name: str) -> str:
+    # Lower-case, trim, whitespace -> '_', then map known variants
+    norm = (
+        name.lower().strip()
+            .replace(" ", "_")
+            .replace("\n", "_")
+            .replace("\t", "_")
+    )
+    return COLUMN_RENAMES.get(norm, norm)
+
+
+def project_columns(names: list[str], columns: list[str]) -> dict[str, str]:
+    # Raw name -> normalized name for the names that normalize into `columns`.
+    # An exact header wins over a variant (e.g. 'metadata' over 'meta_data').
+    mapping = {}
+    for name in sorted(names, key=lambda n: normalize_name(n) != n):
+        norm = normalize_name(name)
+        if norm in columns and norm not in mapping.values():
+            mapping[name] = norm
+    return mapping
+
+
+def parse_list(value) -> list:
+    # The clean CSV holds lists as Python literals, e.g. "['Comedy', 'Drama']"
+    return ast.literal_eval(value) if isinstance(value, str) else []
+
+
+def build(csv_path: str, parquet_path: str):
+    # Project on normalized header names, so variants like 'Duration_' are kept;
+    # columns a file does not carry (e.g. 'metadata') are simply absent
+    header = pd.read_csv(csv_path, nrows=0).columns
+    mapping = project_columns(list(header), CLEAN_COLUMNS)
+    df = pd.read_csv(
+        csv_path,
+        usecols=list(mapping),
+        dtype={raw: DTYPES[norm] for raw, norm in mapping.items() if norm in DTYPES},
+    ).rename(columns=mapping)
+    for col in LIST_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].map(parse_list)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(
+        table,
+        parquet_path,
+        compression="zstd",
+        row_group_size=ROW_GROUP_SIZE,
+    )
+    print(f"{csv_path} -> {parquet_path} ({table.num_rows} rows, {table.num_columns} columns)")
+
+
+if __name__ == "__main__":
+    build(SOURCE_CSV, PARQUET_PATH)
@@ -1,8 +1,18 @@
+import io
+import os
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
-import plotly.figure_factory as ff
+import plotly.graph_objects as go
+import polars as pl
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from build_parquet import CLEAN_COLUMNS, EXPLODE_COLUMNS, project_columns
 
 # ---------------------------
 # App config
@@ -13,55 +23,6 @@ st.set_page_config(
     layout="wide"
 )
 
-# ---------------------------
-# Data loading
-# ---------------------------
-@st.cache_data
-def load_data(clean_path: str, cast_path: str, genre_path: str):
-    df_clean = pd.read_csv(clean_path)
-    df_cast = pd.read_csv(cast_path)
-    df_genre = pd.read_csv(genre_path)
-    return df_clean, df_cast, df_genre
-
-df_clean, df_cast, df_genre = load_data(
-    clean_path="imdb_clean.csv",
-    cast_path="imdb_cast_exploded.csv",
-    genre_path="imdb_genre_exploded.csv"
-)
-
-# ---------------------------
-# Column normalization (keep 'metadata' name unchanged)
-# ---------------------------
-def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    # Preserve 'metadata' if present
-    cols = []
-    for c in df.columns:
-        if c == "metadata":
-            cols.append(c)
-        else:
-            cols.append(
-                c.lower().strip()
-                 .replace(" ", "_")
-                 .replace("\n", "_")
-                 .replace("\t", "_")
-            )
-    df.columns = cols
-    return df
-
-df_clean = normalize_columns(df_clean)
-df_cast = normalize_columns(df_cast)
-df_genre = normalize_columns(df_genre)
-
-# If a variant exists like 'meta_data', rename to 'metadata'
-for df_ in [df_clean, df_cast, df_genre]:
-    if "meta_data" in df_.columns and "metadata" not in df_.columns:
-        df_.rename(columns={"meta_data": "metadata"}, inplace=True)
-
-# Duration fix (rename duration_ -> duration)
-for df_ in [df_clean, df_cast, df_genre]:
-    if "duration_" in df_.columns and "duration" not in df_.columns:
-        df_.rename(columns={"duration_": "duration"}, inplace=True)
-
 # ---------------------------
 # Type assurance for numeric fields
 # ---------------------------
@@ -72,74 +33,222 @@ def coerce_numeric(df: pd.DataFrame, cols: list[str]):
     return df
 
 def impute_and_cast(df: pd.DataFrame):
-    # Metadata can remain float; duration/year -> int for consistency
+    # Metadata can remain float; duration/year -> int for consistency.
+    # Narrowest dtypes that hold the values: int16 covers years and minutes.
     if "metadata" in df.columns:
-        df["metadata"] = df["metadata"].fillna(df["metadata"].median())
+        df["metadata"] = df["metadata"].fillna(df["metadata"].median()).astype("float32")
     if "duration" in df.columns:
-        df["duration"] = df["duration"].fillna(df["duration"].median()).astype(int)
+        df["duration"] = df["duration"].fillna(df["duration"].median()).astype("int16")
     if "year" in df.columns:
-        df["year"] = df["year"].fillna(df["year"].median()).astype(int)
+        df["year"] = df["year"].fillna(df["year"].median()).astype("int16")
     return df
 
-for df_ in [df_clean, df_cast, df_genre]:
-    df_ = coerce_numeric(df_, ["metadata", "duration", "year"])
-    df_ = impute_and_cast(df_)
+# ---------------------------
+# Data loading
+# ---------------------------
+# Parquet files are produced once from the CSVs by build_parquet.py.
+# Columns are read as listed in build_parquet.CLEAN_COLUMNS, matched on
+# normalized names (build_parquet.normalize_name).
+
+def read_parquet_columns(path: str, columns: list[str]) -> pd.DataFrame:
+    # Skip requested columns the file does not carry (e.g. 'metadata')
+    mapping = project_columns(pq.read_schema(path).names, columns)
+    return pd.read_parquet(
+        path,
+        engine="pyarrow",
+        dtype_backend="pyarrow",
+        columns=list(mapping)
+    ).rename(columns=mapping)
+
+@st.cache_data
+def load_data(clean_path: str, mtime: float):
+    # Everything up to a ready-to-filter frame happens here, once per file version
+    # (mtime is only part of the cache key)
+    df_clean = read_parquet_columns(clean_path, CLEAN_COLUMNS)
+    df_clean = coerce_numeric(df_clean, ["metadata", "duration", "year"])
+    df_clean = impute_and_cast(df_clean)
+
+    # 'title' as a categorical: isin/groupby work on integer codes.
+    # 'genre'/'cast' stay Arrow list<string> columns (one row per movie).
+    df_clean["title"] = df_clean["title"].astype("category")
+
+    # Slider bounds, so reruns don't rescan the columns
+    meta = {"year_min": 1900, "year_max": 2025, "meta_min": 0, "meta_max": 100}
+    if "year" in df_clean.columns:
+        meta["year_min"] = int(df_clean["year"].min())
+        meta["year_max"] = int(df_clean["year"].max())
+    if "metadata" in df_clean.columns:
+        meta["meta_min"] = int(np.nanmin(df_clean["metadata"]))
+        meta["meta_max"] = int(np.nanmax(df_clean["metadata"]))
+    return df_clean, meta
+
+DATA_PATH = "imdb_clean.parquet"
+data_version = os.path.getmtime(DATA_PATH)
+
+# Bound for caches keyed on filter_key: every slider stop is a new key, and
+# st.cache_data keeps entries forever unless max_entries/ttl is set
+FILTER_CACHE_ENTRIES = 32
+
+df_clean, meta = load_data(DATA_PATH, mtime=data_version)
+
+# ---------------------------
+# Genre/cast list columns
+# ---------------------------
+def list_has_any(col: pd.Series, values: list) -> np.ndarray:
+    # Rows whose list holds any of `values`: Arrow kernels over the flattened lists
+    arr = pa.array(col)
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    hit = pc.is_in(pc.list_flatten(arr), value_set=pa.array(values, type=arr.type.value_type))
+    mask = np.zeros(len(col), dtype=bool)
+    mask[pc.list_parent_indices(arr).filter(hit).to_numpy()] = True
+    return mask
+
+@st.cache_data
+def list_values(data_version: float, column: str, _df: pd.DataFrame) -> list:
+    # Distinct list elements, for the sidebar options
+    return sorted(pc.unique(pc.list_flatten(pa.array(_df[column]))).drop_null().to_pylist())
+
+@st.cache_data(max_entries=FILTER_CACHE_ENTRIES)
+def explode_filtered(filter_key: tuple, column: str, _df: pd.DataFrame) -> pd.DataFrame:
+    # Long form (one row per list element) of the filtered movies only, carrying
+    # just the columns the tabs aggregate on.
+    # Empty lists become a single row with a missing value, as in the exploded CSVs.
+    keep = [c for c in EXPLODE_COLUMNS if c in _df.columns] + [column]
+    out = _df[keep].explode(column, ignore_index=True)
+    out[column] = out[column].astype("category")
+    return out
 
 # ---------------------------
 # Sidebar filters
 # ---------------------------
 st.sidebar.title("Filters")
 
-# Genre filter uses df_genre for available values
-genres_available = sorted([g for g in df_genre["genre"].dropna().unique()]) if "genre" in df_genre.columns else []
+# Genre filter uses the genre lists for available values
+genres_available = list_values(data_version, "genre", df_clean) if "genre" in df_clean.columns else []
 genre_filter = st.sidebar.multiselect("Genres", genres_available, default=[])
 
-# Cast filter uses df_cast
-cast_available = sorted([c for c in df_cast["cast"].dropna().unique()]) if "cast" in df_cast.columns else []
+# Cast filter uses the cast lists
+cast_available = list_values(data_version, "cast", df_clean) if "cast" in df_clean.columns else []
 cast_filter = st.sidebar.multiselect("Cast members", cast_available, default=[])
 
-# Year range (from df_clean)
-if "year" in df_clean.columns:
-    year_min = int(df_clean["year"].min())
-    year_max = int(df_clean["year"].max())
-else:
-    year_min, year_max = 1900, 2025
+# Year range (bounds precomputed by load_data)
+year_min, year_max = meta["year_min"], meta["year_max"]
 year_range = st.sidebar.slider("Year range", year_min, year_max, (year_min, year_max))
 
 # Metadata score range
-if "metadata" in df_clean.columns:
-    meta_min = int(np.nanmin(df_clean["metadata"]))
-    meta_max = int(np.nanmax(df_clean["metadata"]))
-else:
-    meta_min, meta_max = 0, 100
+meta_min, meta_max = meta["meta_min"], meta["meta_max"]
 meta_range = st.sidebar.slider("Metadata range", meta_min, meta_max, (meta_min, meta_max))
 
-# Title linking between exploded and clean
+# Title column (hover labels)
 title_col = "title" if "title" in df_clean.columns else None
 
-# Apply filters to movie-level df_clean
-df_filtered = df_clean.copy()
-if "year" in df_filtered.columns:
-    df_filtered = df_filtered[df_filtered["year"].between(year_range[0], year_range[1])]
-if "metadata" in df_filtered.columns:
-    df_filtered = df_filtered[df_filtered["metadata"].between(meta_range[0], meta_range[1])]
+# Apply filters to movie-level df_clean as a single boolean mask
+mask = np.ones(len(df_clean), dtype=bool)
+if "year" in df_clean.columns:
+    mask &= df_clean["year"].between(year_range[0], year_range[1]).to_numpy(dtype=bool, na_value=False)
+if "metadata" in df_clean.columns:
+    mask &= df_clean["metadata"].between(meta_range[0], meta_range[1]).to_numpy(dtype=bool, na_value=False)
+
+# Genre/cast filters: movies listing any of the selected values
+if genre_filter and "genre" in df_clean.columns:
+    mask &= list_has_any(df_clean["genre"], genre_filter)
+if cast_filter and "cast" in df_clean.columns:
+    mask &= list_has_any(df_clean["cast"], cast_filter)
+
+# One selection, no intermediate copies; nothing downstream mutates it
+df_filtered = df_clean.loc[mask]
 
-# Reduce by genre filter (via titles present in df_genre)
-if genre_filter and title_col and "genre" in df_genre.columns:
-    titles_with_genre = df_genre[df_genre["genre"].isin(genre_filter)][title_col].unique().tolist()
-    df_filtered = df_filtered[df_filtered[title_col].isin(titles_with_genre)]
+# Hashable identity of the current data + filter state, used as the key for cached aggregations
+filter_key = (data_version, tuple(year_range), tuple(meta_range), tuple(sorted(genre_filter)), tuple(sorted(cast_filter)))
 
-# Reduce by cast filter (via titles present in df_cast)
-if cast_filter and title_col and "cast" in df_cast.columns:
-    titles_with_cast = df_cast[df_cast["cast"].isin(cast_filter)][title_col].unique().tolist()
-    df_filtered = df_filtered[df_filtered[title_col].isin(titles_with_cast)]
+# Exploded genre/cast views, built from the filtered movies only
+df_genre = explode_filtered(filter_key, "genre", df_filtered) if "genre" in df_filtered.columns else pd.DataFrame()
+df_cast = explode_filtered(filter_key, "cast", df_filtered) if "cast" in df_filtered.columns else pd.DataFrame()
 
 st.sidebar.markdown("---")
 st.sidebar.write(f"Filtered movies: {len(df_filtered)}")
 
-# Download filtered data
-csv_bytes = df_filtered.to_csv(index=False).encode("utf-8")
-st.sidebar.download_button("Download filtered CSV", data=csv_bytes, file_name="imdb_filtered.csv", mime="text/csv")
+# Download filtered data (encoded once per filter state)
+@st.cache_data(max_entries=FILTER_CACHE_ENTRIES)
+def filtered_csv(filter_key: tuple, _df: pd.DataFrame) -> bytes:
+    # PyArrow's multi-threaded C++ CSV writer, straight into a bytes buffer.
+    # CSV has no list type, so genre/cast lists are written as Python literals
+    # like imdb_clean.csv ("['Comedy', 'Drama']"); build_parquet.parse_list reads them back.
+    table = pa.Table.from_pandas(_df, preserve_index=False)
+    for i, field in enumerate(table.schema):
+        if pa.types.is_list(field.type):
+            cells = pa.array([None if v is None else repr(v) for v in table.column(i).to_pylist()], pa.string())
+            table = table.set_column(i, field.name, cells)
+    buf = io.BytesIO()
+    pacsv.write_csv(table, buf)
+    return buf.getvalue()
+
+csv_bytes = filtered_csv(filter_key, df_filtered)
+st.sidebar.download_button("Download filtered CSV", data=csv_bytes, file_name="imdb_filtered.csv", mime="text/csv",
+                           key="download_sidebar")
+
+# ---------------------------
+# Genre/cast aggregations (Polars lazy pipeline)
+# ---------------------------
+def group_stats(df: pd.DataFrame, key: str) -> pd.DataFrame:
+    # Per-key row count (and mean metadata when present) over an exploded frame
+    cols = [key] + (["metadata"] if "metadata" in df.columns else [])
+    aggs = [pl.len().alias("count")]
+    if "metadata" in df.columns:
+        aggs.append(pl.col("metadata").mean().alias("avg_meta"))
+    return (
+        pl.from_pandas(df[cols])
+        .lazy()
+        .drop_nulls(key)
+        .group_by(key)
+        .agg(aggs)
+        .with_columns(pl.col(key).cast(pl.String))
+        # Key as tie-breaker: group_by does not keep order and sort is not stable
+        .sort(["count", key], descending=[True, False])
+        .collect()
+        .to_pandas()
+    )
+
+def top_k(stats: pd.DataFrame, key: str, column: str, k: int) -> pd.Series:
+    # Ties broken alphabetically by key so the ranking is the same on every run
+    ranked = stats.sort_values([column, key], ascending=[False, True], na_position="last")
+    return ranked.head(k).set_index(key)[column]
+
+# Cached per filter state. filter_key determines the exploded frames, so the
+# frames themselves are passed unhashed (leading underscore).
+@st.cache_data(max_entries=FILTER_CACHE_ENTRIES)
+def genre_stats_for(filter_key: tuple, _df_genre: pd.DataFrame) -> pd.DataFrame:
+    return group_stats(_df_genre, "genre")
+
+@st.cache_data(max_entries=FILTER_CACHE_ENTRIES)
+def cast_stats_for(filter_key: tuple, _df_cast: pd.DataFrame) -> pd.DataFrame:
+    return group_stats(_df_cast, "cast")
+
+@st.cache_data(max_entries=FILTER_CACHE_ENTRIES)
+def genre_year_pivot(filter_key: tuple, _df_genre: pd.DataFrame) -> pd.DataFrame:
+    # Genre rows counted per movie-level year (year is carried on each exploded row)
+    return pd.crosstab(_df_genre["year"], _df_genre["genre"])
+
+def genre_year_heatmap(pivot: pd.DataFrame):
+    # Shared by the Genre and Yearly trends tabs; the pivot itself is cached
+    return px.imshow(pivot.T, aspect="auto", color_continuous_scale="Viridis",
+                     title="Genre popularity over years (count)")
+
+def corrcoef_frame(df: pd.DataFrame, columns: tuple) -> pd.DataFrame:
+    # Single np.corrcoef over a float32 matrix instead of pandas' pairwise loop
+    values = df[list(columns)].to_numpy(dtype=np.float32)
+    corr = np.corrcoef(values, rowvar=False)
+    return pd.DataFrame(corr, index=list(columns), columns=list(columns))
+
+@st.cache_data
+def full_correlation_matrix(data_version: float, columns: tuple, _df: pd.DataFrame) -> pd.DataFrame:
+    # Unfiltered matrix: computed once per file version, outside the capped per-filter cache
+    return corrcoef_frame(_df, columns)
+
+@st.cache_data(max_entries=FILTER_CACHE_ENTRIES)
+def correlation_matrix(filter_key: tuple, columns: tuple, _df: pd.DataFrame) -> pd.DataFrame:
+    return corrcoef_frame(_df, columns)
 
 # ---------------------------
 # Header
@@ -149,6 +258,7 @@ st.caption("Three-perspective analysis: movie-level (clean), cast-exploded, genr
 
 # ---------------------------
 # Tabs for sections
+# Each tab body is a fragment: its charts and aggregations only run inside it
 # ---------------------------
 tabs = st.tabs([
     "Overview",
@@ -163,29 +273,31 @@ tabs = st.tabs([
 # ---------------------------
 # Overview tab
 # ---------------------------
-with tabs[0]:
+@st.fragment
+def overview_tab(df_filtered, df_genre, df_cast, filter_key):
     st.subheader("Key metrics")
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("Total movies", len(df_filtered))
     col2.metric("Avg duration (min)", round(df_filtered["duration"].mean(), 1) if "duration" in df_filtered.columns else "-")
     col3.metric("Avg metadata", round(df_filtered["metadata"].mean(), 1) if "metadata" in df_filtered.columns else "-")
-    if title_col and "genre" in df_genre.columns:
-        unique_titles_in_genre = df_genre[df_genre[title_col].isin(df_filtered[title_col])] if title_col in df_genre.columns else df_genre
-        col4.metric("Genres covered", len(unique_titles_in_genre["genre"].unique()))
+    if "genre" in df_genre.columns:
+        # Distinct genre codes among the filtered rows (code -1 is a missing genre)
+        present = np.unique(df_genre["genre"].cat.codes.to_numpy())
+        col4.metric("Genres covered", int((present >= 0).sum()))
     else:
         col4.metric("Genres covered", "-")
 
     st.markdown("### Top genres and actors")
-    # Top genres (filtered by titles present)
-    if "genre" in df_genre.columns and title_col in df_genre.columns and title_col in df_filtered.columns:
-        g_counts = (
-            df_genre[df_genre[title_col].isin(df_filtered[title_col])]
-            ["genre"].value_counts().head(15)
-        )
+    genre_stats = genre_stats_for(filter_key, df_genre) if "genre" in df_genre.columns else None
+    cast_stats = cast_stats_for(filter_key, df_cast) if "cast" in df_cast.columns else None
+
+    # Top genres
+    if "genre" in df_genre.columns:
+        g_counts = top_k(genre_stats, "genre", "count", 15)
         fig_g_bar = px.bar(g_counts, x=g_counts.values, y=g_counts.index, orientation="h", title="Top genres (filtered)")
         st.plotly_chart(fig_g_bar, use_container_width=True)
 
-# g_counts is a Series: genre -> count
+        # g_counts is a Series: genre -> count
         g_counts_df = g_counts.reset_index()
         g_counts_df.columns = ["genre", "count"]  # ensure unique names
 
@@ -198,12 +310,9 @@ with tabs[0]:
         st.plotly_chart(fig_g_pie, use_container_width=True)
 
 
-    # Top cast (filtered by titles present)
-    if "cast" in df_cast.columns and title_col in df_cast.columns and title_col in df_filtered.columns:
-        c_counts = (
-            df_cast[df_cast[title_col].isin(df_filtered[title_col])]
-            ["cast"].value_counts().head(15)
-        )
+    # Top cast
+    if "cast" in df_cast.columns:
+        c_counts = top_k(cast_stats, "cast", "count", 15)
         fig_c_bar = px.bar(c_counts, x=c_counts.values, y=c_counts.index, orientation="h", title="Top actors (filtered)")
         st.plotly_chart(fig_c_bar, use_container_width=True)
 
@@ -218,29 +327,33 @@ with tabs[0]:
         )
         st.plotly_chart(fig_c_pie, use_container_width=True)
 
+with tabs[0]:
+    overview_tab(df_filtered, df_genre, df_cast, filter_key)
+
 
 # ---------------------------
 # Genre analysis tab
 # ---------------------------
-with tabs[1]:
+@st.fragment
+def genre_tab(df_genre, filter_key):
     st.subheader("Genre analysis")
-    if "genre" in df_genre.columns and title_col in df_genre.columns and title_col in df_filtered.columns:
-        dfg = df_genre[df_genre[title_col].isin(df_filtered[title_col])].copy()
+    if "genre" in df_genre.columns:
+        genre_stats = genre_stats_for(filter_key, df_genre)
 
         # Top genres by frequency
-        g_counts = dfg["genre"].value_counts().head(20)
+        g_counts = top_k(genre_stats, "genre", "count", 20)
         fig_g_counts = px.bar(g_counts, x=g_counts.values, y=g_counts.index, orientation="h", title="Top genres by count")
         st.plotly_chart(fig_g_counts, use_container_width=True)
 
         # Average metadata per genre
-        if "metadata" in dfg.columns:
-            g_scores = dfg.groupby("genre")["metadata"].mean().sort_values(ascending=False).head(20)
+        if "avg_meta" in genre_stats.columns:
+            g_scores = top_k(genre_stats, "genre", "avg_meta", 20)
             fig_g_scores = px.bar(g_scores, x=g_scores.values, y=g_scores.index, orientation="h", title="Average metadata by genre (top 20)")
             st.plotly_chart(fig_g_scores, use_container_width=True)
 
         # Boxplots for duration and metadata by genre
-        top_genres = dfg["genre"].value_counts().head(12).index
-        dfg_top = dfg[dfg["genre"].isin(top_genres)]
+        top_genres = top_k(genre_stats, "genre", "count", 12).index
+        dfg_top = df_genre[df_genre["genre"].isin(top_genres)]
         if "duration" in dfg_top.columns:
             fig_box_dur = px.box(dfg_top, x="genre", y="duration", title="Duration distribution by genre (top 12)")
             st.plotly_chart(fig_box_dur, use_container_width=True)
@@ -250,93 +363,79 @@ with tabs[1]:
     
 
         # Genre trend over years
-        if "year" in df_clean.columns:
-
-            # Map movie-level year to each genre row via title
-            df_year_genre = dfg_top.merge(
-                df_clean[[title_col, "year"]],
-                on=title_col,
-                how="left"
-            ) if title_col and title_col in df_clean.columns else dfg_top
-            df_year_genre = df_genre.merge(
-                df_clean[[title_col, "year"]],
-                on=title_col,
-                how="left"
-            )
-
-            # Fix duplicate year columns
-            if "year_x" in df_year_genre.columns and "year_y" in df_year_genre.columns:
-                # Prefer the one from df_clean (year_y), or coalesce
-                df_year_genre["year"] = df_year_genre["year_y"].fillna(df_year_genre["year_x"])
-                df_year_genre = df_year_genre.drop(columns=["year_x", "year_y"])
-            elif "year_x" in df_year_genre.columns:
-                df_year_genre = df_year_genre.rename(columns={"year_x": "year"})
-            elif "year_y" in df_year_genre.columns:
-                df_year_genre = df_year_genre.rename(columns={"year_y": "year"})
-
-            # Now safe to dropna
-            df_year_genre = df_year_genre.dropna(subset=["year"])
-
-            pivot = df_year_genre.pivot_table(index="year", columns="genre", values=title_col, aggfunc="count").fillna(0)
-            fig_heat = px.imshow(pivot.T, aspect="auto", color_continuous_scale="Viridis", title="Genre popularity over years (count)")
+        if "year" in df_genre.columns:
+            pivot = genre_year_pivot(filter_key, df_genre)
+            fig_heat = genre_year_heatmap(pivot)
             st.plotly_chart(fig_heat, use_container_width=True)
     else:
         st.info("Genre or title columns missing for genre analysis.")
 
+with tabs[1]:
+    genre_tab(df_genre, filter_key)
+
 # ---------------------------
 # Cast analysis tab
 # ---------------------------
 # ---------------------------
 # Cast analysis tab
 # ---------------------------
-with tabs[2]:
+@st.fragment
+def cast_tab(df_cast, filter_key):
     st.subheader("Cast analysis")
-    if "cast" in df_cast.columns and title_col in df_cast.columns and title_col in df_filtered.columns:
-        dfc = df_cast[df_cast[title_col].isin(df_filtered[title_col])].copy()
+    if "cast" in df_cast.columns:
+        cast_stats = cast_stats_for(filter_key, df_cast)
 
         # Top actors by frequency
-        c_counts = dfc["cast"].value_counts().head(20)
+        c_counts = top_k(cast_stats, "cast", "count", 20)
         fig_c_counts = px.bar(c_counts, x=c_counts.values, y=c_counts.index,
                               orientation="h", title="Top actors by count")
         st.plotly_chart(fig_c_counts, use_container_width=True)
 
         # Average metadata by actor
-        if "metadata" in dfc.columns:
-            c_scores = dfc.groupby("cast")["metadata"].mean().sort_values(ascending=False).head(20)
+        if "avg_meta" in cast_stats.columns:
+            c_scores = top_k(cast_stats, "cast", "avg_meta", 20)
             fig_c_scores = px.bar(c_scores, x=c_scores.values, y=c_scores.index,
                                   orientation="h", title="Average metadata by actor (top 20)")
             st.plotly_chart(fig_c_scores, use_container_width=True)
 
         # Boxplot metadata by actor (top 15 frequent)
-        top_actors = dfc["cast"].value_counts().head(15).index
-        dfc_top = dfc[dfc["cast"].isin(top_actors)]
+        top_actors = top_k(cast_stats, "cast", "count", 15).index
+        dfc_top = df_cast[df_cast["cast"].isin(top_actors)]
         if "metadata" in dfc_top.columns:
             fig_box_meta_actor = px.box(dfc_top, x="cast", y="metadata",
                                         title="Metadata distribution by actor (top 15)")
             st.plotly_chart(fig_box_meta_actor, use_container_width=True)
 
         # Actor trend over years (count of appearances)
-        if title_col and "year" in df_clean.columns:
-            df_year_cast = dfc_top.merge(df_clean[[title_col, "year"]], on=title_col, how="left")
-
-            # unify year_x/year_y
-            if "year_x" in df_year_cast.columns and "year_y" in df_year_cast.columns:
-                df_year_cast["year"] = df_year_cast["year_y"].fillna(df_year_cast["year_x"])
-                df_year_cast = df_year_cast.drop(columns=["year_x", "year_y"])
-            elif "year_x" in df_year_cast.columns:
-                df_year_cast = df_year_cast.rename(columns={"year_x": "year"})
-            elif "year_y" in df_year_cast.columns:
-                df_year_cast = df_year_cast.rename(columns={"year_y": "year"})
-
-            if "year" in df_year_cast.columns:
-                df_year_cast = df_year_cast.dropna(subset=["year"])
-                count_by_year = df_year_cast.groupby(["year", "cast"]).size().reset_index(name="appearances")
-                fig_line_cast = px.line(count_by_year, x="year", y="appearances", color="cast",
-                                        title="Actor appearances over years (top 15)", markers=True)
-                st.plotly_chart(fig_line_cast, use_container_width=True)
+        if "year" in dfc_top.columns:
+            # Year per exploded row, actor as its position among the top actors;
+            # count on a dense grid.
+            years = dfc_top["year"].to_numpy(dtype=float, na_value=np.nan)
+            actor_idx = pd.Categorical(dfc_top["cast"], categories=top_actors).codes
+            known = ~np.isnan(years)
+            years, actor_idx = years[known].astype(np.int32), actor_idx[known]
+            if len(years):
+                year_min = years.min()
+                counts = np.zeros((years.max() - year_min + 1, len(top_actors)), dtype=np.int32)
+                np.add.at(counts, (years - year_min, actor_idx), 1)
+                # Keep observed (year, actor) pairs only, ordered by year
+                yi, ai = np.nonzero(counts)
+                count_by_year = pd.DataFrame({
+                    "year": yi + year_min,
+                    "cast": np.asarray(top_actors)[ai],
+                    "appearances": counts[yi, ai],
+                })
+            else:
+                count_by_year = pd.DataFrame({"year": [], "cast": [], "appearances": []})
+            fig_line_cast = px.line(count_by_year, x="year", y="appearances", color="cast",
+                                    title="Actor appearances over years (top 15)", markers=True)
+            st.plotly_chart(fig_line_cast, use_container_width=True)
     else:
         st.info("Cast or title columns missing for cast analysis.")
 
+with tabs[2]:
+    cast_tab(df_cast, filter_key)
+
 
 # ---------------------------
 # Yearly trends tab
@@ -345,7 +444,8 @@ with tabs[2]:
 # ---------------------------
 # Yearly trends tab
 # ---------------------------
-with tabs[3]:
+@st.fragment
+def yearly_tab(df_filtered, df_genre, filter_key):
     st.subheader("Yearly trends (movie-level)")
     if "year" in df_filtered.columns:
         # Count per year
@@ -369,87 +469,101 @@ with tabs[3]:
             st.plotly_chart(fig_meta, use_container_width=True)
 
         # Genre popularity heatmap over years (count)
-        if "genre" in df_genre.columns and title_col in df_genre.columns and title_col in df_clean.columns:
-            df_year_genre = df_genre.merge(df_clean[[title_col, "year"]],
-                                           on=title_col, how="left")
-
-            # unify year_x/year_y
-            if "year_x" in df_year_genre.columns and "year_y" in df_year_genre.columns:
-                df_year_genre["year"] = df_year_genre["year_y"].fillna(df_year_genre["year_x"])
-                df_year_genre = df_year_genre.drop(columns=["year_x", "year_y"])
-            elif "year_x" in df_year_genre.columns:
-                df_year_genre = df_year_genre.rename(columns={"year_x": "year"})
-            elif "year_y" in df_year_genre.columns:
-                df_year_genre = df_year_genre.rename(columns={"year_y": "year"})
-
-            if "year" in df_year_genre.columns:
-                df_year_genre = df_year_genre.dropna(subset=["year"])
-                pivot = df_year_genre.pivot_table(index="year", columns="genre",
-                                                  values=title_col, aggfunc="count").fillna(0)
-                fig_heatmap_yearly = px.imshow(
-                    pivot.T,
-                    aspect="auto",
-                    color_continuous_scale="Viridis",
-                    title="Genre popularity over years (count)"
-                )
-                st.plotly_chart(fig_heatmap_yearly, use_container_width=True, key="heatmap_yearly")
+        if "genre" in df_genre.columns:
+            pivot = genre_year_pivot(filter_key, df_genre)
+            fig_heatmap_yearly = genre_year_heatmap(pivot)
+            st.plotly_chart(fig_heatmap_yearly, use_container_width=True, key="heatmap_yearly")
     else:
         st.info("Year column missing in movie-level dataset.")
 
+with tabs[3]:
+    yearly_tab(df_filtered, df_genre, filter_key)
+
 # ---------------------------
 # Scatter plots tab
 # ---------------------------
-with tabs[4]:
+SCATTER_MAX_POINTS = 20_000
+
+@st.fragment
+def scatter_tab(df_filtered):
     st.subheader("Scatter plots (movie-level)")
+    # WebGL markers; very large selections are sampled down before plotting
+    df_plot = df_filtered
+    if len(df_plot) > SCATTER_MAX_POINTS:
+        df_plot = df_plot.sample(SCATTER_MAX_POINTS, random_state=0)
+        st.caption(f"Showing a random sample of {SCATTER_MAX_POINTS:,} of {len(df_filtered):,} movies.")
+
     if {"metadata", "duration"}.issubset(df_filtered.columns):
-        fig_scatter1 = px.scatter(df_filtered, x="duration", y="metadata",
+        fig_scatter1 = px.scatter(df_plot, x="duration", y="metadata",
                                   color="year" if "year" in df_filtered.columns else None,
-                                  title="Metadata vs Duration", hover_data=[title_col] if title_col else None)
+                                  title="Metadata vs Duration", hover_data=[title_col] if title_col else None,
+                                  render_mode="webgl")
         st.plotly_chart(fig_scatter1, use_container_width=True)
 
     if {"metadata", "year"}.issubset(df_filtered.columns):
-        fig_scatter2 = px.scatter(df_filtered, x="year", y="metadata",
+        fig_scatter2 = px.scatter(df_plot, x="year", y="metadata",
                                   color="duration" if "duration" in df_filtered.columns else None,
-                                  title="Metadata vs Year", hover_data=[title_col] if title_col else None)
+                                  title="Metadata vs Year", hover_data=[title_col] if title_col else None,
+                                  render_mode="webgl")
         st.plotly_chart(fig_scatter2, use_container_width=True)
 
     if {"duration", "year"}.issubset(df_filtered.columns):
-        fig_scatter3 = px.scatter(df_filtered, x="year", y="duration",
+        fig_scatter3 = px.scatter(df_plot, x="year", y="duration",
                                   color="metadata" if "metadata" in df_filtered.columns else None,
-                                  title="Duration vs Year", hover_data=[title_col] if title_col else None)
+                                  title="Duration vs Year", hover_data=[title_col] if title_col else None,
+                                  render_mode="webgl")
         st.plotly_chart(fig_scatter3, use_container_width=True)
 
+with tabs[4]:
+    scatter_tab(df_filtered)
+
 # ---------------------------
 # Correlation tab
 # ---------------------------
-with tabs[5]:
+@st.fragment
+def correlation_tab(df_filtered, filter_key):
     st.subheader("Correlation analysis (movie-level)")
     num_cols = [c for c in ["metadata", "duration", "year"] if c in df_filtered.columns]
     if len(num_cols) >= 2:
-        corr = df_filtered[num_cols].corr()
-        fig_corr_heatmap = ff.create_annotated_heatmap(
+        # No filter removed any movie: reuse the once-per-file full matrix
+        if len(df_filtered) == len(df_clean):
+            corr = full_correlation_matrix(data_version, tuple(num_cols), df_clean)
+        else:
+            corr = correlation_matrix(filter_key, tuple(num_cols), df_filtered)
+        fig_corr_heatmap = go.Figure(go.Heatmap(
             z=corr.values,
             x=num_cols,
             y=num_cols,
             colorscale="Viridis",
+            text=np.round(corr.values, 2),
+            texttemplate="%{text}",
             showscale=True
-        )
+        ))
         fig_corr_heatmap.update_layout(title="Correlation heatmap")
         st.plotly_chart(fig_corr_heatmap, use_container_width=True)
     else:
         st.info("Insufficient numeric columns for correlation.")
 
+with tabs[5]:
+    correlation_tab(df_filtered, filter_key)
+
 # ---------------------------
 # Data table tab
 # ---------------------------
-with tabs[6]:
+@st.fragment
+def data_tab(df_filtered, filter_key):
     st.subheader("Filtered data")
-    st.dataframe(df_filtered, use_container_width=True, height=600)
+    # Hand Streamlit an Arrow table directly; it ships Arrow IPC to the browser
+    st.dataframe(pa.Table.from_pandas(df_filtered, preserve_index=False), use_container_width=True, height=600)
 
     st.markdown("#### Export")
     st.download_button(
         label="Download filtered CSV",
-        data=df_filtered.to_csv(index=False).encode("utf-8"),
+        data=filtered_csv(filter_key, df_filtered),
         file_name="imdb_filtered.csv",
-        mime="text/csv"
+        mime="text/csv",
+        key="download_table"
     )
+
+with tabs[6]:
+    data_tab(df_filtered, filter_key)